@@ -19,7 +19,8 @@ module.exports = {
   testMatch: [
     "**/tests/authMiddleware.test.ts",
     "**/tests/userMiddleware.test.ts", 
-    "**/tests/inferenceMiddleware.test.ts"
+    "**/tests/inferenceMiddleware.test.ts",
+    "**/tests/inferenceBlackBoxAdapter.test.ts"
   ],
 
   // Transform TypeScript files
@@ -7,13 +7,38 @@ using a simulated computer vision model.
 """
 
 import os
+import re
+import json
+import mmap
 import uuid
+import functools
+import itertools
+import collections
+import queue
 import logging
-import tempfile
-from typing import Dict, List
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# Keep native libraries single-threaded within each process: the service already runs
+# its OpenCV calls on worker threads, inside several gunicorn worker processes.
+# These variables are only read when numpy and cv2 are first imported.
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+os.environ.setdefault('OPENBLAS_NUM_THREADS', '1')
+
+# pylint: disable=wrong-import-position
 import cv2
 import numpy as np
 from flask import Flask, request, jsonify
+# pylint: enable=wrong-import-position
+
+# Threads OpenCV may use inside a single call. Images, videos and video frames are
+# already processed concurrently on thread pools.
+cv2.setNumThreads(int(os.getenv('INFERENCE_BLACKBOX_CV_THREADS', '1')))
+
+# Encoder options for FFmpeg-backed video writers, favouring encode speed
+os.environ.setdefault('OPENCV_FFMPEG_WRITER_OPTIONS', 'preset;ultrafast')
 
 # Configure logging to provide visibility into the service's operations.
 log_level = os.getenv('INFERENCE_BLACKBOX_LOG_LEVEL')
@@ -25,7 +50,197 @@ logger = logging.getLogger(__name__)
 # Initialize the Flask application.
 app = Flask(__name__)
 
-class InferenceBlackBox:
+# Files at least this large are decoded straight from a memory map instead of a copy
+_MMAP_READ_THRESHOLD = 16 * 1024 * 1024
+
+def _read_image(path: str, flags: int = cv2.IMREAD_COLOR) -> Optional[np.ndarray]:
+    """
+    Read a whole image file in one call and decode it from memory, mapping large files
+    instead of copying them. Like cv2.imread, returns None when the file is missing or
+    cannot be decoded.
+    """
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return None
+            if size >= _MMAP_READ_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    data = np.frombuffer(mapped, dtype=np.uint8)
+                    try:
+                        return cv2.imdecode(data, flags)
+                    finally:
+                        # The map can only be closed once no array refers to it
+                        del data
+            data = np.fromfile(f, dtype=np.uint8)
+    except OSError:
+        return None
+    return cv2.imdecode(data, flags)
+
+def _write_file(path: str, data: np.ndarray) -> None:
+    """
+    Write an encoded image buffer to disk.
+    """
+    with open(path, 'wb') as f:
+        f.write(data)
+
+# Rows blended per band, so each band of image, mask and weights stays in L2 cache
+_BLEND_TILE_ROWS = 64
+
+def _blend_into(image: np.ndarray, mask: np.ndarray, mask_gray: np.ndarray,
+                out: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Blend the mask over the image in a single pass and write the result into `out`.
+    The mask covers at most half of the image, weighted by its grayscale intensity.
+    `weights` is an optional float32 scratch buffer of shape (2, _BLEND_TILE_ROWS, width)
+    that callers blending many frames can reuse across calls.
+    """
+    height, width = image.shape[:2]
+    if weights is None or weights.shape[2] < width:
+        weights = np.empty((2, _BLEND_TILE_ROWS, width), dtype=np.float32)
+
+    for y0 in range(0, height, _BLEND_TILE_ROWS):
+        y1 = min(y0 + _BLEND_TILE_ROWS, height)
+
+        # Per-pixel blend weights for this band, computed into the scratch buffer
+        mask_weight = weights[0, :y1 - y0, :width]
+        image_weight = weights[1, :y1 - y0, :width]
+        np.multiply(mask_gray[y0:y1], np.float32(0.5 / 255.0), out=mask_weight)
+        np.subtract(np.float32(1.0), mask_weight, out=image_weight)
+
+        # blendLinear works on the uint8 images directly and saturates the result,
+        # so no float copies of the 3-channel images and no clipping pass are needed
+        cv2.blendLinear(
+            image[y0:y1], mask[y0:y1], image_weight, mask_weight, dst=out[y0:y1]
+        )
+
+    return out
+
+# Frames buffered between the stages of the video pipeline
+_FRAME_QUEUE_SIZE = 2
+
+def _put_frame(frames: queue.Queue, item, stop: threading.Event) -> bool:
+    """
+    Put an item on a pipeline queue, giving up if the pipeline is being stopped.
+    """
+    while not stop.is_set():
+        try:
+            frames.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _acquire_slot(slots: threading.Semaphore, stop: threading.Event) -> bool:
+    """
+    Take a slot of a semaphore, giving up if the pipeline is being stopped.
+    """
+    while not stop.is_set():
+        if slots.acquire(timeout=0.1):
+            return True
+    return False
+
+def _get_frame(frames: queue.Queue, stop: threading.Event):
+    """
+    Get the next item from a pipeline queue, or None if the pipeline is being stopped.
+    """
+    while not stop.is_set():
+        try:
+            return frames.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return None
+
+# H.264 writers tried before the MPEG-4 Part 2 fallback, as backend and writer params.
+# A hardware-accelerated open fails outright when no accelerator can be configured,
+# so the software encoder is tried separately.
+_H264_WRITERS = (
+    (cv2.CAP_FFMPEG, [cv2.VIDEOWRITER_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]),
+    (cv2.CAP_FFMPEG, [cv2.VIDEOWRITER_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_NONE]),
+)
+
+# H.264 writers that failed to open in this process. Failed opens are slow and log
+# errors from OpenCV and FFmpeg, so they are not retried for later videos.
+_unavailable_h264_writers = set()
+
+def _open_video_writer(output_path: str, width: int, height: int) -> cv2.VideoWriter:
+    """
+    Open the writer for a reconstructed video, preferring H.264 through FFmpeg (on a
+    hardware encoder, then in software) and falling back to MPEG-4 Part 2 when the
+    OpenCV build has no usable H.264 encoder.
+    """
+    # Create video writer with 1 FPS to match original sampling
+    # Since we extracted 1 frame per second, we reconstruct at 1 FPS
+    fps = 1.0
+
+    failed = []
+    for index, (api, params) in enumerate(_H264_WRITERS):
+        if index in _unavailable_h264_writers:
+            continue
+        writer = cv2.VideoWriter(
+            output_path, api, cv2.VideoWriter_fourcc(*'avc1'), fps, (width, height), params
+        )
+        if writer.isOpened():
+            return writer
+        failed.append(index)
+
+    writer = cv2.VideoWriter(
+        output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height)
+    )
+    if not writer.isOpened():
+        raise ValueError(f"Could not open video writer for: {output_path}")
+
+    # The fallback could write to the same path, so the H.264 writers are unavailable
+    _unavailable_h264_writers.update(failed)
+    return writer
+
+class _FramePool:
+    """
+    Output frame buffers of the video pipeline, recycled once they have been written.
+    Up to `size` written frames are kept for reuse, further ones are dropped.
+    """
+    def __init__(self, size: int):
+        self.free_frames = queue.Queue(maxsize=size)
+
+    def acquire(self, image: np.ndarray) -> np.ndarray:
+        """
+        Get a buffer shaped like `image`, reusing a written frame when one is free.
+        """
+        try:
+            frame = self.free_frames.get_nowait()
+        except queue.Empty:
+            return np.empty_like(image)
+        if frame.shape != image.shape:
+            return np.empty_like(image)
+        return frame
+
+    def release(self, frame: np.ndarray) -> None:
+        """
+        Hand a written frame back to the pool.
+        """
+        try:
+            self.free_frames.put_nowait(frame)
+        except queue.Full:
+            pass
+
+def _write_frames(writer: cv2.VideoWriter, frames: queue.Queue, pool: _FramePool,
+                  stop: threading.Event) -> None:
+    """
+    Writer stage of the video pipeline: encode frames until the end-of-stream marker,
+    handing each frame buffer back to the pool once it has been written.
+    """
+    try:
+        while True:
+            frame = _get_frame(frames, stop)
+            if frame is None:
+                return
+            writer.write(frame)
+            pool.release(frame)
+    except Exception:
+        stop.set()
+        raise
+
+class InferenceBlackBox:  # pylint: disable=too-many-instance-attributes
     """
     Encapsulates all the business logic for processing datasets.
     """
@@ -39,129 +254,362 @@ class InferenceBlackBox:
         self.output_dir = os.path.join(self.upload_dir, "inferences")
         os.makedirs(self.output_dir, exist_ok=True)
 
+        # Input paths are relative to the uploads directory and joined onto this prefix
+        self._upload_prefix = self.upload_dir.rstrip(os.sep) + os.sep
+
+        # Output files are named from a random prefix drawn once per instance and a
+        # counter, unique across restarts and gunicorn workers sharing the volume
+        self._output_prefix = uuid.uuid4().hex
+        self._output_seq = itertools.count()
+
+        # Loads masks alongside their images so both files are read in parallel, and
+        # writes encoded output images in the background
+        self._io_executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+        # Loads and blends video frames for all concurrent videos. The slots cap the
+        # frames in flight but not yet handed on to a writer, across all videos of the
+        # process, so a single video can keep every core busy.
+        self._frame_loaders = ThreadPoolExecutor(max_workers=os.cpu_count())
+        self._frame_load_slots = threading.BoundedSemaphore(os.cpu_count())
+
+        # Per-thread blend weight scratch of the frame loaders
+        self._blend_scratch = threading.local()
+
+        # Run the blend once on a dummy frame so OpenCV's dispatch is initialized
+        # before the first request comes in
+        dummy = np.zeros((64, 64, 3), dtype=np.uint8)
+        dummy_gray = np.zeros((64, 64), dtype=np.uint8)
+        _blend_into(dummy, dummy, dummy_gray, np.empty_like(dummy))
+
     def process_image_pair(self, image_path: str, mask_path: str) -> np.ndarray:
         """
         Process a single image-mask pair. This method simulates a computer vision
         model (e.g., inpainting) by overlaying a semi-transparent mask on the image.
         """
         try:
-            # Read image and mask
-            image_full_path = os.path.join(self.upload_dir, image_path)
-            mask_full_path = os.path.join(self.upload_dir, mask_path)
+            image, mask = self._load_image_pair(image_path, mask_path)
+            return self._blend_image_pair(image, mask)
 
-            # Load image
-            image = cv2.imread(image_full_path)
-            if image is None:
-                raise ValueError(f"Could not load image: {image_path}")
+        except Exception as e:
+            logger.error("Error processing image pair: %s", str(e))
+            raise
 
-            # Load mask
-            mask = cv2.imread(mask_full_path)
-            if mask is None:
-                raise ValueError(f"Could not load mask: {mask_path}")
+    def _upload_path(self, relative_path: str) -> str:
+        """
+        Resolve a path relative to the uploads directory, rejecting absolute paths and
+        paths that lead out of it.
+        """
+        if relative_path.startswith(os.sep) or '..' in relative_path.split(os.sep):
+            raise ValueError(f"Path outside the uploads directory: {relative_path}")
+        return self._upload_prefix + relative_path
 
-            # Resize mask to match image dimensions
-            if image.shape[:2] != mask.shape[:2]:
-                mask = cv2.resize(mask, (image.shape[1], image.shape[0]))
+    def _load_image_pair(self, image_path: str, mask_path: str):
+        """
+        Load an image and its mask from the uploads directory.
+        """
+        # Read image and mask
+        image_full_path = self._upload_path(image_path)
 
-            # Convert mask to grayscale for blending
-            mask_gray = cv2.cvtColor(mask, cv2.COLOR_BGR2GRAY)
-            mask_normalized = mask_gray.astype(np.float32) / 255.0
+        # Load mask in the background
+        mask_future = self._io_executor.submit(self._load_mask, mask_path)
 
-            # Create alpha channel from mask
-            mask_3channel = np.stack([mask_normalized] * 3, axis=-1)
+        # Load image
+        image = _read_image(image_full_path)
+        if image is None:
+            raise ValueError(f"Could not load image: {image_path}")
 
-            # Blend image and mask
-            # This simulates inpainting by overlaying the mask
-            result = (
-                image.astype(np.float32) * (1 - mask_3channel * 0.5) +
-                mask.astype(np.float32) * (mask_3channel * 0.5)
-            )
-            result = np.clip(result, 0, 255).astype(np.uint8)
+        # Wait for mask
+        mask = mask_future.result()
 
-            return result
+        return image, mask
 
-        except Exception as e:
-            logger.error("Error processing image pair: %s", str(e))
-            raise
+    @functools.lru_cache(maxsize=8)
+    def _load_mask(self, mask_path: str) -> np.ndarray:
+        """
+        Load a mask from the uploads directory, keeping grayscale masks single-channel.
+        Decoded masks are cached, since video frames often share a single mask; the
+        cached arrays are read-only.
+        """
+        mask = _read_image(self._upload_path(mask_path), cv2.IMREAD_ANYCOLOR)
+        if mask is None:
+            raise ValueError(f"Could not load mask: {mask_path}")
+
+        mask.flags.writeable = False
+        return mask
+
+    @staticmethod
+    def _blend_image_pair(image: np.ndarray, mask: np.ndarray,
+                          result: Optional[np.ndarray] = None,
+                          weights: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Overlay a loaded mask on its image. Callers processing many frames can pass
+        a reusable output buffer and blend weight scratch (see _blend_into).
+        """
+        # Resize mask to match image dimensions, using area averaging when shrinking.
+        # Small upscales use nearest neighbour, which is much cheaper and barely
+        # visible under a half-transparent overlay; large ones stay bilinear.
+        if image.shape[:2] != mask.shape[:2]:
+            if mask.shape[0] > image.shape[0]:
+                interpolation = cv2.INTER_AREA
+            elif image.shape[0] > 2 * mask.shape[0]:
+                interpolation = cv2.INTER_LINEAR
+            else:
+                interpolation = cv2.INTER_NEAREST
+            mask = cv2.resize(
+                mask, (image.shape[1], image.shape[0]), interpolation=interpolation
+            )
 
-    def save_processed_image(self, image: np.ndarray, user_id: str, filename: str) -> str:
+        # Grayscale masks already hold the blend weights; color masks are converted
+        if mask.ndim == 2:
+            mask_gray = mask
+        else:
+            mask_gray = cv2.cvtColor(mask, cv2.COLOR_BGR2GRAY)
+
+        # Only pixels inside the bounding box of the non-zero mask change, the
+        # rest of the image is copied as is
+        x, y, width, height = cv2.boundingRect(mask_gray)
+        if result is None:
+            result = np.empty_like(image)
+
+        # A fully white mask is an even mix everywhere, which needs no per-pixel weights
+        if (width == image.shape[1] and height == image.shape[0] and
+                cv2.minMaxLoc(mask_gray)[0] == 255):
+            if mask.ndim == 2:
+                return cv2.addWeighted(image, 0.5, image, 0.0, 127.5, dst=result)
+            return cv2.addWeighted(image, 0.5, mask, 0.5, 0.0, dst=result)
+
+        if width == 0 or height == 0:
+            np.copyto(result, image)
+            return result
+        rows, cols = slice(y, y + height), slice(x, x + width)
+
+        # Copy only the strips around the box, which the blend does not overwrite
+        result[:y] = image[:y]
+        result[y + height:] = image[y + height:]
+        result[rows, :x] = image[rows, :x]
+        result[rows, x + width:] = image[rows, x + width:]
+
+        # Grayscale masks are expanded to BGR for the overlay, within the box only
+        mask_roi = mask[rows, cols]
+        if mask_roi.ndim == 2:
+            mask_roi = cv2.cvtColor(mask_roi, cv2.COLOR_GRAY2BGR)
+
+        # Blend image and mask
+        # This simulates inpainting by overlaying the mask
+        _blend_into(
+            image[rows, cols], mask_roi, mask_gray[rows, cols], result[rows, cols], weights
+        )
+        return result
+
+    def _next_output_name(self) -> str:
         """
-        Save processed image to the output directory and return its relative path.
+        Return a unique prefix for the next output file.
         """
-        user_output_dir = os.path.join(self.output_dir, user_id)
-        os.makedirs(user_output_dir, exist_ok=True)
+        return f"{self._output_prefix}_{next(self._output_seq):08d}"
 
+    def save_processed_image(self, image: np.ndarray, user_output_dir: str,
+                             filename: str) -> Tuple[str, Future]:
+        """
+        Save processed image to an existing output directory. The image is encoded
+        right away and written in the background; returns its relative path and a
+        future that completes once the file is on disk.
+        """
         # Generate unique filename to avoid collisions
-        output_filename = f"{uuid.uuid4()}_{filename}"
+        output_filename = f"{self._next_output_name()}_{filename}"
         output_path = os.path.join(user_output_dir, output_filename)
 
+        # Encode image, with fast PNG compression
+        ok, encoded = cv2.imencode(
+            os.path.splitext(filename)[1], image, [cv2.IMWRITE_PNG_COMPRESSION, 1]
+        )
+        if not ok:
+            raise ValueError(f"Could not encode image: {filename}")
+
         # Save image
-        cv2.imwrite(output_path, image)
+        write = self._io_executor.submit(_write_file, output_path, encoded)
 
         # Return relative path from uploads directory
-        return os.path.relpath(output_path, self.upload_dir)
+        return os.path.relpath(output_path, self.upload_dir), write
 
-    def process_video_frames(self, frame_pairs: List[Dict], user_id: str, video_id: str) -> str:
+    def process_video_frames(self, frame_pairs: List[Dict], user_output_dir: str,
+                             video_id: str) -> str:
         """
-        Process video frames, reconstruct video, and return its relative path.
+        Process video frames, reconstruct video in an existing output directory,
+        and return its relative path.
+        Frames are loaded and blended concurrently while earlier ones are encoded.
         """
+        output_path = None
         try:
             # Sort frames by frame index
             frame_pairs.sort(key=lambda x: x.get('frameIndex', 0))
 
-            # Create temporary directory for frames
-            with tempfile.TemporaryDirectory() as temp_dir:
-                processed_frames = []
+            # Generate unique filename to avoid collisions
+            output_filename = f"{self._next_output_name()}_video_{video_id}.mp4"
+            output_path = os.path.join(user_output_dir, output_filename)
 
-                # Process each frame
-                for i, pair in enumerate(frame_pairs):
-                    processed_image = self.process_image_pair(
-                        pair['imagePath'], pair['maskPath']
-                    )
+            self._run_video_pipeline(frame_pairs, output_path)
+
+            # Return relative path from uploads directory
+            return os.path.relpath(output_path, self.upload_dir)
+
+        except Exception as e:
+            logger.error("Error processing video frames: %s", str(e))
+            # Do not leave a partially written video behind
+            if output_path and os.path.exists(output_path):
+                os.remove(output_path)
+            raise
+
+    def _run_video_pipeline(self, frame_pairs: List[Dict], output_path: str) -> None:
+        """
+        Load and blend frames concurrently on the shared frame loaders, each frame holding
+        one of the process-wide load slots, and encode them in frame order on a writer
+        thread fed through a bounded queue.
+        """
+        frames = queue.Queue(maxsize=_FRAME_QUEUE_SIZE)
+        stop = threading.Event()
+        pool = _FramePool(_FRAME_QUEUE_SIZE + 2)
+        pending = collections.deque()
+        out = None
 
-                    # Save frame to temp directory
-                    frame_filename = f"frame_{i:04d}.png"
-                    frame_path = os.path.join(temp_dir, frame_filename)
-                    cv2.imwrite(frame_path, processed_image)
-                    processed_frames.append(frame_path)
-
-                # Ensure there are frames to process
-                if not processed_frames:
-                    raise ValueError("No frames to process")
-
-                # Create output video
-                user_output_dir = os.path.join(self.output_dir, user_id)
-                os.makedirs(user_output_dir, exist_ok=True)
-
-                # Generate unique filename to avoid collisions
-                output_filename = f"{uuid.uuid4()}_video_{video_id}.mp4"
-                output_path = os.path.join(user_output_dir, output_filename)
-
-                # Read first frame to get dimensions
-                first_frame = cv2.imread(processed_frames[0])
-                height, width, _ = first_frame.shape
-
-                # Create video writer with 1 FPS to match original sampling
-                # Since we extracted 1 frame per second, we reconstruct at 1 FPS
-                fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-                fps = 1.0
-                out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-
-                # Write all frames to video
-                for frame_path in processed_frames:
-                    frame = cv2.imread(frame_path)
-                    if frame is not None:
-                        out.write(frame)
-
-                # Release video writer
+        try:
+            with ThreadPoolExecutor(max_workers=1) as stages:
+                writer = None
+
+                def hand_on() -> bool:
+                    # Wait for the oldest frame, free its slot and queue it for the writer
+                    nonlocal out, writer
+                    future = pending.popleft()
+                    try:
+                        frame = future.result()
+                    finally:
+                        self._frame_load_slots.release()
+
+                    # The first frame gives the video dimensions
+                    if out is None:
+                        height, width = frame.shape[:2]
+
+                        out = _open_video_writer(output_path, width, height)
+                        writer = stages.submit(_write_frames, out, frames, pool, stop)
+
+                    return _put_frame(frames, frame, stop)
+
+                try:
+                    for pair in frame_pairs:
+                        # Without a free slot, hand on the oldest frame first. A video only
+                        # waits for a slot while holding none, so videos cannot starve
+                        # each other.
+                        acquired = False
+                        while not acquired and not stop.is_set():
+                            if not pending:
+                                acquired = _acquire_slot(self._frame_load_slots, stop)
+                            # pylint: disable-next=consider-using-with
+                            elif self._frame_load_slots.acquire(blocking=False):
+                                acquired = True
+                            else:
+                                hand_on()
+                        if not acquired:
+                            break
+
+                        pending.append(self._frame_loaders.submit(
+                            self._load_and_blend_frame, pair, pool
+                        ))
+                    while pending and not stop.is_set():
+                        hand_on()
+
+                    # Signal the end of the stream and surface errors from the writer
+                    _put_frame(frames, None, stop)
+                    if writer is None:
+                        raise ValueError("No frames to process")
+                    writer.result()
+
+                finally:
+                    # Unblock the writer, and let frames that will not be written give
+                    # their slots back once they are done
+                    stop.set()
+                    for future in pending:
+                        future.cancel()
+                        future.add_done_callback(lambda _: self._frame_load_slots.release())
+        finally:
+            # Release video writer
+            if out is not None:
                 out.release()
 
-                # Return relative path from uploads directory
-                return os.path.relpath(output_path, self.upload_dir)
+    def _load_and_blend_frame(self, pair: Dict, pool: _FramePool) -> np.ndarray:
+        """
+        Load a video frame pair and blend it into a buffer from the pipeline's pool,
+        using this thread's blend weight scratch.
+        """
+        image, mask = self._load_image_pair(pair['imagePath'], pair['maskPath'])
+
+        weights = getattr(self._blend_scratch, 'weights', None)
+        if weights is None or weights.shape[2] < image.shape[1]:
+            weights = np.empty((2, _BLEND_TILE_ROWS, image.shape[1]), dtype=np.float32)
+            self._blend_scratch.weights = weights
+
+        return self._blend_image_pair(image, mask, pool.acquire(image), weights)
 
+    def _process_one_image(self, pair: Dict,
+                           user_output_dir: str) -> Optional[Tuple[Dict, Future]]:
+        """
+        Process and save a single image pair, returning its result entry and pending
+        file write, or None on failure.
+        """
+        try:
+            # Process the image pair
+            processed_image = self.process_image_pair(
+                pair['imagePath'], pair['maskPath']
+            )
+
+            # Generate output filename
+            original_filename = os.path.basename(pair['imagePath'])
+            name, _ = os.path.splitext(original_filename)
+            output_filename = f"processed_{name}.png"
+
+            # Save processed image
+            output_path, write = self.save_processed_image(
+                processed_image, user_output_dir, output_filename
+            )
+
+            return {
+                "originalPath": pair['imagePath'],
+                "outputPath": output_path
+            }, write
+
+        except RuntimeError:
+            # Executors refuse new work once the process is shutting down. The whole
+            # dataset fails then, rather than being reported without this image.
+            raise
         except Exception as e:
-            logger.error("Error processing video frames: %s", str(e))
+            logger.error(
+                "Error processing single image %s: %s",
+                pair['imagePath'], str(e)
+            )
+            return None
+
+    def _process_one_video(self, video_id, frame_pairs: List[Dict],
+                           user_output_dir: str) -> Optional[Dict]:
+        """
+        Process a video group, returning its result entry or None on failure.
+        """
+        try:
+            # Process video frames and reconstruct video
+            output_path = self.process_video_frames(
+                frame_pairs, user_output_dir, str(video_id)
+            )
+
+            return {
+                "originalVideoId": str(video_id),
+                "outputPath": output_path
+            }
+
+        except RuntimeError:
+            # Raised by executors when the process is shutting down, see _process_one_image
             raise
+        except Exception as e:
+            logger.error(
+                "Error processing video %s: %s", video_id, str(e)
+            )
+            return None
 
     def process_dataset(self, user_id: str, dataset_data: Dict) -> Dict:
         """
@@ -192,60 +640,48 @@ class InferenceBlackBox:
                 else:  # This is a single image
                     single_images.append(pair)
 
+            # Create the user's output directory once for all images and videos
+            user_output_dir = os.path.join(self.output_dir, user_id)
+            os.makedirs(user_output_dir, exist_ok=True)
+
             # Initialize lists to keep track of processed images and videos
             processed_images = []
             processed_videos = []
-
-            # Process single images
-            for pair in single_images:
+            pending_images = []
+
+            # Process single images concurrently. OpenCV releases the GIL while
+            # decoding, blending and encoding, and every image gets its own output path.
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                for result in executor.map(
+                    self._process_one_image, single_images,
+                    [user_output_dir] * len(single_images)
+                ):
+                    if result is not None:
+                        pending_images.append(result)
+
+            # Process video groups concurrently. Each video has its own pipeline and
+            # VideoWriter, and its OpenCV work runs without holding the GIL.
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                for result in executor.map(
+                    self._process_one_video,
+                    video_groups.keys(), video_groups.values(),
+                    [user_output_dir] * len(video_groups)
+                ):
+                    if result is not None:
+                        processed_videos.append(result)
+
+            # Wait for the image files, which were written while the videos were processed
+            for entry, write in pending_images:
                 try:
-                    # Process the image pair
-                    processed_image = self.process_image_pair(
-                        pair['imagePath'], pair['maskPath']
-                    )
-
-                    # Generate output filename
-                    original_filename = os.path.basename(pair['imagePath'])
-                    name, _ = os.path.splitext(original_filename)
-                    output_filename = f"processed_{name}.png"
-
-                    # Save processed image
-                    output_path = self.save_processed_image(
-                        processed_image, user_id, output_filename
-                    )
-
-                    # Append to results
-                    processed_images.append({
-                        "originalPath": pair['imagePath'],
-                        "outputPath": output_path
-                    })
-
-                except Exception as e:
+                    write.result()
+                    processed_images.append(entry)
+                except OSError as e:
                     logger.error(
-                        "Error processing single image %s: %s",
-                        pair['imagePath'], str(e)
-                    )
-                    continue
-
-            # Process video groups
-            for video_id, frame_pairs in video_groups.items():
-                try:
-                    # Process video frames and reconstruct video
-                    output_path = self.process_video_frames(
-                        frame_pairs, user_id, str(video_id)
+                        "Error saving single image %s: %s", entry['originalPath'], str(e)
                     )
 
-                    # Append to results
-                    processed_videos.append({
-                        "originalVideoId": str(video_id),
-                        "outputPath": output_path
-                    })
-
-                except Exception as e:
-                    logger.error(
-                        "Error processing video %s: %s", video_id, str(e)
-                    )
-                    continue
+            # Drop masks cached for this dataset
+            self._load_mask.cache_clear()
 
             # Log completion
             logger.info(
@@ -266,10 +702,155 @@ class InferenceBlackBox:
 # Initialize the blackbox service
 blackbox = InferenceBlackBox()
 
+# Accepted datasets are processed in the background. Job state lives in files under the
+# uploads directory, so any gunicorn worker can answer a status poll.
+job_executor = ThreadPoolExecutor()
+jobs_dir = os.path.join(blackbox.upload_dir, "inference-jobs")
+os.makedirs(jobs_dir, exist_ok=True)
+
+# Queued and running jobs have their state file refreshed this often. A job not refreshed
+# for _JOB_STALE_SECONDS lost its worker and is reported as failed. Job files are removed
+# _JOB_TTL_SECONDS after their last update, whether or not they were polled.
+_JOB_HEARTBEAT_SECONDS = 10
+_JOB_STALE_SECONDS = 60
+_JOB_TTL_SECONDS = 3600
+
+# Status of the jobs accepted by this process that have no result yet
+_active_jobs: Dict[str, str] = {}
+_active_jobs_lock = threading.Lock()
+
+def _job_path(job_id: str) -> str:
+    """
+    Path of the state file of a queued or running job.
+    """
+    return os.path.join(jobs_dir, f"{job_id}.json")
+
+def _result_path(job_id: str) -> str:
+    """
+    Path of the result file of a completed job.
+    """
+    return os.path.join(jobs_dir, f"{job_id}.result.json")
+
+def _temp_path(path: str) -> str:
+    """
+    Temporary path to write a job file before moving it in place.
+    """
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+def _write_job(job_id: str, status: str) -> None:
+    """
+    Atomically replace the state file of a job.
+    """
+    path = _job_path(job_id)
+    temp_path = _temp_path(path)
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({"status": status, "pid": os.getpid(), "updatedAt": time.time()}, f)
+    os.replace(temp_path, path)
+
+def _read_job_file(path: str) -> Optional[Dict]:
+    """
+    Read a job file, or None if it does not exist.
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _set_job_status(job_id: str, status: Optional[str]) -> None:
+    """
+    Record the status of a job owned by this process, or stop tracking it with None.
+    """
+    with _active_jobs_lock:
+        if status is None:
+            _active_jobs.pop(job_id, None)
+        else:
+            _active_jobs[job_id] = status
+            _write_job(job_id, status)
+
+def _heartbeat_jobs() -> None:
+    """
+    Refresh the state files of the jobs owned by this process.
+    """
+    while True:
+        time.sleep(_JOB_HEARTBEAT_SECONDS)
+        with _active_jobs_lock:
+            for job_id, status in _active_jobs.items():
+                try:
+                    _write_job(job_id, status)
+                except OSError as e:
+                    logger.error("Error refreshing job %s: %s", job_id, str(e))
+
+threading.Thread(target=_heartbeat_jobs, daemon=True).start()
+
+def _publish_result(job_id: str, result: Dict) -> bool:
+    """
+    Record the result of a job unless one was recorded already, returning whether it
+    was recorded. The result file is linked into place, so only the first one is kept.
+    """
+    path = _result_path(job_id)
+    temp_path = _temp_path(path)
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({"status": "completed", "result": result}, f)
+    try:
+        os.link(temp_path, path)
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        os.remove(temp_path)
+
+def _remove_outputs(result: Dict) -> None:
+    """
+    Delete the output files listed in a dataset result.
+    """
+    for entry in result.get("images", []) + result.get("videos", []):
+        try:
+            os.remove(os.path.join(blackbox.upload_dir, entry["outputPath"]))
+        except OSError:
+            continue
+
+def _run_job(job_id: str, user_id: str, dataset_data: Dict) -> None:
+    """
+    Process a dataset in the background and record its result.
+    """
+    try:
+        _set_job_status(job_id, "running")
+        result = blackbox.process_dataset(user_id, dataset_data)
+    except Exception as e:
+        result = {"success": False, "error": str(e)}
+    finally:
+        # Stop the heartbeat before the result is recorded
+        _set_job_status(job_id, None)
+
+    try:
+        # A job reported as interrupted keeps that result, and its late outputs are dropped
+        if not _publish_result(job_id, result):
+            logger.error("Job %s was reported as interrupted, discarding its result", job_id)
+            _remove_outputs(result)
+        os.remove(_job_path(job_id))
+    except Exception as e:
+        logger.error("Error saving result of job %s: %s", job_id, str(e))
+
+def _sweep_jobs() -> None:
+    """
+    Remove job files that have not been updated within _JOB_TTL_SECONDS.
+    """
+    expiry = time.time() - _JOB_TTL_SECONDS
+    with os.scandir(jobs_dir) as entries:
+        for entry in entries:
+            try:
+                if entry.stat().st_mtime < expiry:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                # Swept concurrently by another worker
+                continue
+
 @app.route('/process-dataset', methods=['POST'])
 def process_dataset():
     """
-    Endpoint to process a dataset.
+    Endpoint to process a dataset. The dataset is processed in the background and the
+    response carries the job ID to poll on /jobs/<job_id>.
     """
     try:
         # Parse JSON request
@@ -285,15 +866,58 @@ def process_dataset():
         if not user_id or not dataset_data:
             return jsonify({"success": False, "error": "Missing userId or data"}), 400
 
-        # Process the dataset using the blackbox
-        result = blackbox.process_dataset(user_id, dataset_data)
+        # Drop job files nobody collected
+        _sweep_jobs()
+
+        # Queue the dataset for processing by the blackbox. The job is kept alive by the
+        # heartbeat while it waits for a free executor worker.
+        job_id = uuid.uuid4().hex
+        _set_job_status(job_id, "queued")
+        try:
+            job_executor.submit(_run_job, job_id, user_id, dataset_data)
+        except Exception:
+            _set_job_status(job_id, None)
+            raise
 
-        return jsonify(result)
+        return jsonify({"success": True, "jobId": job_id}), 202
 
     except Exception as e:
         logger.error("Error in process_dataset endpoint: %s", str(e))
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Endpoint to poll a dataset processing job. A completed job keeps returning its
+    result until its result file expires.
+    """
+    try:
+        # Job IDs are generated as hex UUIDs, reject anything else
+        if not re.fullmatch(r'[0-9a-f]{32}', job_id):
+            return jsonify({"success": False, "error": "Job not found"}), 404
+
+        completed = _read_job_file(_result_path(job_id))
+        if completed is None:
+            state = _read_job_file(_job_path(job_id))
+            if state is not None and time.time() - state["updatedAt"] <= _JOB_STALE_SECONDS:
+                return jsonify({"status": state["status"]})
+
+            # A job whose worker stopped refreshing it will never complete. Its failure is
+            # recorded, unless the job completed in the meantime.
+            if state is not None:
+                _publish_result(
+                    job_id, {"success": False, "error": "Processing was interrupted"}
+                )
+            completed = _read_job_file(_result_path(job_id))
+            if completed is None:
+                return jsonify({"success": False, "error": "Job not found"}), 404
+
+        return jsonify(completed)
+
+    except Exception as e:
+        logger.error("Error in get_job endpoint: %s", str(e))
+        return jsonify({"success": False, "error": str(e)}), 500
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """
@@ -313,6 +937,7 @@ if __name__ == '__main__':
     if not debug_str:
         raise ValueError("INFERENCE_BLACKBOX_DEBUG environment variable is required")
 
+    # Development server only; the container serves the app through gunicorn
     port = int(port_str)
     debug = debug_str.lower() == 'true'
-    app.run(host=host, port=port, debug=debug)
+    app.run(host=host, port=port, debug=debug, threaded=True)
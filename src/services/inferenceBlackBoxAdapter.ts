@@ -20,6 +20,23 @@ interface ProcessingResponse {
     error?: string;
 }
 
+// Response from the Python service when a dataset is accepted for processing
+interface JobAcceptedResponse {
+    success: boolean;
+    jobId?: string;
+    error?: string;
+}
+
+// Status of a processing job on the Python service
+interface JobStatusResponse {
+    status: "queued" | "running" | "completed";
+    result?: ProcessingResponse;
+}
+
+const JOB_TIMEOUT_MS = 300000; // 5 minutes timeout for a whole dataset
+const JOB_POLL_INTERVAL_MS = 1000; // Delay between job status checks
+const REQUEST_TIMEOUT_MS = 30000; // Timeout of each HTTP request to the service
+
 // InferenceBlackBoxAdapter provides an abstraction layer to communicate with the external Python service.
 export class InferenceBlackBoxAdapter {
     private static instance: InferenceBlackBoxAdapter;
@@ -61,28 +78,37 @@ export class InferenceBlackBoxAdapter {
                 parameters
             };
 
-            // Make HTTP request to Python service
-            const response = await axios.post(
+            // Make HTTP request to Python service, which queues the dataset as a job
+            const response = await axios.post<JobAcceptedResponse>(
                 `${this.pythonServiceUrl}/process-dataset`,
                 request,
                 {
-                    timeout: 300000, // 5 minutes timeout
+                    timeout: REQUEST_TIMEOUT_MS,
                     headers: {
                         "Content-Type": "application/json"
                     }
                 }
             );
 
+            if (!response.data.success || !response.data.jobId) {
+                const errorMessage = response.data.error || "Processing request rejected";
+                this.inferenceLogger.logBlackBoxProcessingFailed(userId, errorMessage);
+                throw this.errorManager.createError(ErrorStatus.inferenceProcessingFailedError, errorMessage);
+            }
+
+            // Wait for the job to complete
+            const result = await this.waitForJob(response.data.jobId);
+
             // Handle response
-            if (response.data.success) {
+            if (result.success) {
                 this.inferenceLogger.logBlackBoxProcessingCompleted(
                     userId, 
-                    response.data.images?.length || 0,
-                    response.data.videos?.length || 0
+                    result.images?.length || 0,
+                    result.videos?.length || 0
                 );
-                return response.data;
+                return result;
             } else {
-                const errorMessage = response.data.error || "Processing failed";
+                const errorMessage = result.error || "Processing failed";
                 this.inferenceLogger.logBlackBoxProcessingFailed(userId, errorMessage);
                 throw this.errorManager.createError(ErrorStatus.inferenceProcessingFailedError, errorMessage);
             }
@@ -128,4 +154,43 @@ export class InferenceBlackBoxAdapter {
             throw this.errorManager.createError(ErrorStatus.inferenceProcessingFailedError, err.message);
         }
     }
+
+    // Polls the Python service until a processing job completes or the timeout expires.
+    private async waitForJob(jobId: string): Promise<ProcessingResponse> {
+        const deadline = Date.now() + JOB_TIMEOUT_MS;
+
+        while (Date.now() < deadline) {
+            try {
+                const response = await axios.get<JobStatusResponse>(
+                    `${this.pythonServiceUrl}/jobs/${jobId}`,
+                    { timeout: REQUEST_TIMEOUT_MS }
+                );
+
+                if (response.data.status === "completed" && response.data.result) {
+                    return response.data.result;
+                }
+            } catch (error) {
+                // A failed poll (e.g. during a worker restart) is retried until the deadline
+                if (!this.isTransientPollError(error)) {
+                    throw error;
+                }
+                const message = error instanceof Error ? error.message : "Unknown error";
+                this.errorLogger.logDatabaseError("BLACKBOX_JOB_POLL_FAILED", "python_service", `Job ${jobId}: ${message}`);
+            }
+
+            await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+        }
+
+        this.errorLogger.logDatabaseError("BLACKBOX_JOB_TIMEOUT", "python_service", `Job ${jobId} did not complete in time`);
+        throw this.errorManager.createError(ErrorStatus.externalServiceError, `Python service job ${jobId} timed out`);
+    }
+
+    // Network errors, timeouts and 5xx responses are transient; anything else, such as
+    // a 404 for an unknown job, fails the wait right away.
+    private isTransientPollError(error: unknown): boolean {
+        if (!axios.isAxiosError(error)) {
+            return false;
+        }
+        return !error.response || error.response.status >= 500;
+    }
 }
@@ -0,0 +1,134 @@
+import axios from "axios";
+import { InferenceBlackBoxAdapter } from "../src/services/inferenceBlackBoxAdapter";
+import { ErrorStatus } from "../src/factory/status";
+
+// Mock external dependencies
+jest.mock("axios");
+
+// Plain functions rather than jest.fn(), so resetMocks does not clear them between tests
+jest.mock("../src/factory/loggerFactory", () => ({
+  loggerFactory: {
+    createInferenceLogger: () => ({
+      log: () => undefined,
+      logBlackBoxProcessingStarted: () => undefined,
+      logBlackBoxProcessingCompleted: () => undefined,
+      logBlackBoxProcessingFailed: () => undefined,
+    }),
+    createErrorLogger: () => ({
+      log: () => undefined,
+      logDatabaseError: () => undefined,
+    }),
+  },
+}));
+
+// Cast mocked functions for correct Jest type-checking
+const mockedPost = axios.post as jest.Mock;
+const mockedGet = axios.get as jest.Mock;
+const mockedIsAxiosError = axios.isAxiosError as unknown as jest.Mock;
+
+// Builds an Axios-like error, with an HTTP status for response errors
+const axiosError = (message: string, status?: number) =>
+  Object.assign(new Error(message), {
+    isAxiosError: true,
+    request: {},
+    response: status ? { status } : undefined,
+  });
+
+describe("InferenceBlackBoxAdapter Suite", () => {
+  const adapter = InferenceBlackBoxAdapter.getInstance();
+  const completedResult = {
+    success: true,
+    images: [{ originalPath: "img.png", outputPath: "inferences/u1/out.png" }],
+    videos: [],
+  };
+
+  beforeEach(() => {
+    jest.useFakeTimers();
+    mockedIsAxiosError.mockImplementation(
+      (error: unknown) => (error as { isAxiosError?: boolean })?.isAxiosError === true
+    );
+    mockedPost.mockResolvedValue({ data: { success: true, jobId: "job-1" } });
+  });
+
+  afterEach(() => {
+    jest.useRealTimers();
+  });
+
+  describe("processDataset", () => {
+    it("should poll an accepted job until it completes", async () => {
+      mockedGet
+        .mockResolvedValueOnce({ data: { status: "queued" } })
+        .mockResolvedValueOnce({ data: { status: "running" } })
+        .mockResolvedValueOnce({ data: { status: "completed", result: completedResult } });
+
+      const promise = adapter.processDataset("u1", { pairs: [] }, {});
+      await jest.advanceTimersByTimeAsync(5000);
+
+      await expect(promise).resolves.toEqual(completedResult);
+      expect(mockedGet).toHaveBeenCalledTimes(3);
+      expect(mockedGet.mock.calls[0][0]).toContain("/jobs/job-1");
+    });
+
+    it("should fail without polling if the dataset is rejected", async () => {
+      mockedPost.mockResolvedValue({ data: { success: false, error: "Missing userId or data" } });
+
+      await expect(adapter.processDataset("u1", {}, {})).rejects.toMatchObject({
+        errorType: ErrorStatus.inferenceProcessingFailedError,
+        message: "Missing userId or data",
+      });
+      expect(mockedGet).not.toHaveBeenCalled();
+    });
+
+    it("should fail if the job completes without success", async () => {
+      mockedGet.mockResolvedValue({
+        data: { status: "completed", result: { success: false, error: "Processing was interrupted" } },
+      });
+
+      const promise = adapter.processDataset("u1", { pairs: [] }, {});
+      const assertion = expect(promise).rejects.toMatchObject({
+        errorType: ErrorStatus.inferenceProcessingFailedError,
+        message: "Processing was interrupted",
+      });
+      await jest.advanceTimersByTimeAsync(1000);
+      await assertion;
+    });
+
+    it("should time out if the job does not complete before the deadline", async () => {
+      mockedGet.mockResolvedValue({ data: { status: "running" } });
+
+      const promise = adapter.processDataset("u1", { pairs: [] }, {});
+      const assertion = expect(promise).rejects.toMatchObject({
+        errorType: ErrorStatus.externalServiceError,
+        message: expect.stringContaining("timed out"),
+      });
+      await jest.advanceTimersByTimeAsync(301000);
+      await assertion;
+    });
+
+    it("should retry a poll that fails with a transient error", async () => {
+      mockedGet
+        .mockRejectedValueOnce(axiosError("socket hang up"))
+        .mockRejectedValueOnce(axiosError("Service Unavailable", 503))
+        .mockResolvedValueOnce({ data: { status: "completed", result: completedResult } });
+
+      const promise = adapter.processDataset("u1", { pairs: [] }, {});
+      await jest.advanceTimersByTimeAsync(5000);
+
+      await expect(promise).resolves.toEqual(completedResult);
+      expect(mockedGet).toHaveBeenCalledTimes(3);
+    });
+
+    it("should fail right away if the job is not found", async () => {
+      mockedGet.mockRejectedValue(axiosError("Not Found", 404));
+
+      const promise = adapter.processDataset("u1", { pairs: [] }, {});
+      const assertion = expect(promise).rejects.toMatchObject({
+        errorType: ErrorStatus.externalServiceError,
+        message: expect.stringContaining("Status 404"),
+      });
+      await jest.advanceTimersByTimeAsync(1000);
+      await assertion;
+      expect(mockedGet).toHaveBeenCalledTimes(1);
+    });
+  });
+});